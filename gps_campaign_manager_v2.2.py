@@ -3,29 +3,176 @@
 GPS Campaign Manager v2.2 - Enhanced with Campaign Creation
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Blueprint, render_template, jsonify, request
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO, emit
+import orjson
 import sqlite3
 import threading
+import queue
+import time
 import logging
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-import uuid
+import secrets
 import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'gps-campaign-manager-secret-key'
-socketio = SocketIO(app, cors_allowed_origins="*")
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson's C serializer.
+
+    jsonify() and response encoding go through this provider, which is
+    several times faster than stdlib json on the dict-heavy chart payloads
+    and serializes datetimes natively.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+# Routes live on a blueprint and SocketIO is created unbound, so the app,
+# its URL map and the Socket.IO namespaces are built exactly once inside
+# create_app() no matter how the module is consumed.
+campaigns_bp = Blueprint('campaigns', __name__)
+# An external message queue (e.g. redis://...) lets emits reach clients on
+# other workers when scaled beyond a single process
+socketio = SocketIO(
+    cors_allowed_origins="*",
+    message_queue=os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+)
 
 # Database setup
 DB_PATH = os.path.join(os.path.dirname(__file__), 'campaigns.db')
 
+def apply_pragmas(conn):
+    """Apply performance PRAGMAs to a connection.
+
+    WAL lets dashboard reads run concurrently with campaign writes, and
+    synchronous=NORMAL drops the full fsync on every commit (safe in WAL
+    mode). The rest keep temp tables and the page cache in memory.
+    """
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-20000')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA foreign_keys=ON')
+
+# Labels for the duration_bucket generated column, indexed by bucket value
+DURATION_BUCKET_LABELS = ('< 1 hour', '1-4 hours', '4-8 hours', '> 8 hours')
+
+# Expression behind the duration_bucket generated column; kept separate so
+# the CREATE TABLE and the migration ALTER stay in sync
+DURATION_BUCKET_EXPR = '''(
+        CASE
+            WHEN duration_hours <= 1 THEN 0
+            WHEN duration_hours <= 4 THEN 1
+            WHEN duration_hours <= 8 THEN 2
+            ELSE 3
+        END
+    )'''
+
+# Hot-path SQL defined once at module level. Paired with cached_statements
+# on the pooled connections, each query is parsed and planned only the
+# first time it runs on a given connection.
+SQL = {
+    'stats_fused': '''
+        SELECT
+            COUNT(*) as total,
+            COALESCE(SUM(status = 'completed'), 0) as completed,
+            COALESCE(SUM(status = 'running'), 0) as running,
+            CASE WHEN COUNT(*) > 0
+                 THEN CAST(100 * SUM(status = 'completed') / COUNT(*) AS INTEGER)
+                 ELSE 0
+            END as success_rate
+        FROM campaigns
+    ''',
+    'by_status': '''
+        SELECT status, COUNT(*) as count
+        FROM campaigns
+        GROUP BY status
+        ORDER BY count DESC
+    ''',
+    'by_mode': '''
+        SELECT account_mode, COUNT(*) as count
+        FROM campaigns
+        WHERE account_mode IS NOT NULL
+        GROUP BY account_mode
+        ORDER BY count DESC
+    ''',
+    'duration_dist': '''
+        SELECT duration_bucket, COUNT(*) as count
+        FROM campaigns
+        GROUP BY duration_bucket
+        ORDER BY duration_bucket
+    ''',
+    'trend_30d': '''
+        SELECT
+            DATE(created_at, 'unixepoch') as date,
+            COUNT(*) as count
+        FROM campaigns
+        WHERE created_at >= strftime('%s', 'now', '-30 days')
+        GROUP BY date
+        ORDER BY date
+    ''',
+    'active': '''
+        SELECT id, name, device_id, account_mode, duration_hours,
+               status, current_step, progress,
+               datetime(created_at, 'unixepoch') as created_at
+        FROM campaigns
+        WHERE status IN ('pending', 'running')
+        ORDER BY created_at DESC
+        LIMIT 10
+    ''',
+    'insert_campaign': '''
+        INSERT INTO campaigns (
+            id, name, device_id, account_mode,
+            duration_hours, status, current_step
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''',
+    'insert_campaign_running': '''
+        INSERT INTO campaigns (
+            id, name, device_id, account_mode,
+            duration_hours, status, current_step, started_at
+        ) VALUES (?, ?, ?, ?, ?, 'running', 'Initializing...', CURRENT_TIMESTAMP)
+    ''',
+    'start': '''
+        UPDATE campaigns
+        SET status = 'running',
+            started_at = CURRENT_TIMESTAMP,
+            current_step = 'Initializing...'
+        WHERE id = ?
+    ''',
+    'delete': 'DELETE FROM campaigns WHERE id = ?',
+    'insert_logs': '''
+        INSERT INTO campaign_logs (campaign_id, level, message)
+        VALUES (?, ?, ?)
+    ''',
+    'complete': '''
+        UPDATE campaigns
+        SET status = 'completed',
+            completed_at = CURRENT_TIMESTAMP,
+            current_step = ?,
+            progress = 100
+        WHERE id = ?
+    ''',
+    'fail': '''
+        UPDATE campaigns
+        SET status = 'failed',
+            error_message = ?
+        WHERE id = ?
+    ''',
+}
+
 def init_db():
     """Initialize the database with campaigns table"""
     conn = sqlite3.connect(DB_PATH)
+    apply_pragmas(conn)
     cursor = conn.cursor()
 
     # Create campaigns table
@@ -39,11 +186,28 @@ def init_db():
             status TEXT DEFAULT 'pending',
             current_step TEXT,
             progress REAL DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at INTEGER DEFAULT (strftime('%s', 'now')),
             started_at TIMESTAMP,
             completed_at TIMESTAMP,
-            error_message TEXT
+            error_message TEXT,
+            duration_bucket INTEGER GENERATED ALWAYS AS {bucket_expr} VIRTUAL
+        )
+    '''.format(bucket_expr=DURATION_BUCKET_EXPR))
+
+    # Migrate databases created before the generated column existed
+    try:
+        cursor.execute(
+            'ALTER TABLE campaigns ADD COLUMN duration_bucket INTEGER '
+            'GENERATED ALWAYS AS {bucket_expr} VIRTUAL'.format(bucket_expr=DURATION_BUCKET_EXPR)
         )
+    except sqlite3.OperationalError:
+        pass  # column already exists
+
+    # Migrate text timestamps to epoch integers so the 30-day trend filter
+    # compares int64s instead of parsing date strings per row
+    cursor.execute('''
+        UPDATE campaigns SET created_at = strftime('%s', created_at)
+        WHERE typeof(created_at) = 'text'
     ''')
 
     # Create campaign_logs table
@@ -54,149 +218,189 @@ def init_db():
             level TEXT,
             message TEXT,
             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (campaign_id) REFERENCES campaigns (id)
+            FOREIGN KEY (campaign_id) REFERENCES campaigns (id) ON DELETE CASCADE
         )
     ''')
 
+    # Indexes for the dashboard hot paths: COUNT/GROUP BY on status and
+    # account_mode, the active-campaigns list (status + created_at DESC),
+    # the 30-day trend scan, and log cleanup by campaign_id.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_status_created ON campaigns(status, created_at DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns(created_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_account_mode ON campaigns(account_mode)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_campaign ON campaign_logs(campaign_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_bucket ON campaigns(duration_bucket)')
+    cursor.execute('ANALYZE')
+
     conn.commit()
     conn.close()
     logger.info("Database initialized")
 
-def get_db_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+class ConnectionPool:
+    """Bounded pool of pre-opened SQLite connections.
+
+    Opening a fresh connection per request makes SQLite re-parse the schema
+    and allocate a new page cache every time, which dominates latency for
+    the small dashboard queries. Connections are opened once at startup and
+    borrowed/returned around each request instead.
+    """
+
+    def __init__(self, db_path, size=5):
+        self._pool = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._create_connection(db_path))
+
+    @staticmethod
+    def _create_connection(db_path):
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn)
+        return conn
+
+    @contextmanager
+    def borrow(self):
+        """Borrow a connection from the pool, returning it when done"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            # Never hand back a connection mid-transaction: an exception
+            # between execute() and commit() would otherwise leak partial
+            # writes into the next borrower's commit/rollback
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+db_pool = ConnectionPool(DB_PATH)
+
+class DashboardCache:
+    """Short-TTL cache for the dashboard endpoints.
+
+    Many clients poll stats and charts, but the underlying counts only
+    change when a campaign changes state, so responses are cached for a
+    few seconds and invalidated explicitly on every state transition.
+    """
+
+    def __init__(self, ttl_seconds=5):
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() < entry[0]:
+                return entry[1]
+        return None
+
+    def set(self, key, value):
+        """Cache value under key for the TTL window"""
+        with self._lock:
+            self._entries[key] = (time.time() + self._ttl, value)
+
+    def invalidate(self):
+        """Drop all cached entries (called on campaign state changes)"""
+        with self._lock:
+            self._entries.clear()
+
+dashboard_cache = DashboardCache()
+
+def rows_as_dicts(cursor):
+    """Materialize a cursor as plain dicts built from tuple rows.
+
+    The column list is captured once from the cursor description and rows
+    come back as tuples, skipping the per-row sqlite3.Row wrapper the
+    response endpoints would otherwise pay for before serialization.
+    """
+    cursor.row_factory = None
+    cols = [d[0] for d in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
 
 # Routes
-@app.route('/')
+@campaigns_bp.route('/')
 def index():
     """Serve the dashboard"""
     return render_template('dashboard.html')
 
-@app.route('/dashboard')
+@campaigns_bp.route('/dashboard')
 def dashboard():
     """Serve the dashboard (alias for root)"""
     return render_template('dashboard.html')
 
-@app.route('/create')
+@campaigns_bp.route('/create')
 def create_campaign_page():
     """Serve the campaign creation page"""
     return render_template('create.html')
 
 # API Routes
-@app.route('/api/dashboard/stats')
+@campaigns_bp.route('/api/dashboard/stats')
 def get_stats():
     """Get dashboard statistics"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Total campaigns
-    cursor.execute('SELECT COUNT(*) as count FROM campaigns')
-    total = cursor.fetchone()['count']
-
-    # Completed campaigns
-    cursor.execute('SELECT COUNT(*) as count FROM campaigns WHERE status = "completed"')
-    completed = cursor.fetchone()['count']
-
-    # Running campaigns
-    cursor.execute('SELECT COUNT(*) as count FROM campaigns WHERE status = "running"')
-    running = cursor.fetchone()['count']
-
-    # Calculate success rate
-    if total > 0:
-        success_rate = int((completed / total) * 100)
-    else:
-        success_rate = 0
-
-    conn.close()
-    return jsonify({
+    cached = dashboard_cache.get('stats')
+    if cached is not None:
+        return jsonify(cached)
+
+    with db_pool.borrow() as conn:
+        # Single conditional aggregation, success rate included, so the
+        # whole endpoint is one query and zero Python arithmetic
+        cursor = conn.execute(SQL['stats_fused'])
+        cursor.row_factory = None
+        total, completed, running, success_rate = cursor.fetchone()
+
+    payload = {
         'total_campaigns': total,
         'completed': completed,
         'running': running,
         'success_rate': success_rate
-    })
+    }
+    dashboard_cache.set('stats', payload)
+    return jsonify(payload)
 
-@app.route('/api/dashboard/charts')
+@campaigns_bp.route('/api/dashboard/charts')
 def get_charts():
     """Get chart data"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # By status
-    cursor.execute('''
-        SELECT status, COUNT(*) as count
-        FROM campaigns
-        GROUP BY status
-        ORDER BY count DESC
-    ''')
-    by_status = [dict(row) for row in cursor.fetchall()]
-
-    # By account mode
-    cursor.execute('''
-        SELECT account_mode, COUNT(*) as count
-        FROM campaigns
-        WHERE account_mode IS NOT NULL
-        GROUP BY account_mode
-        ORDER BY count DESC
-    ''')
-    by_mode = [dict(row) for row in cursor.fetchall()]
-
-    # Duration distribution
-    cursor.execute('''
-        SELECT
-            CASE
-                WHEN duration_hours <= 1 THEN '< 1 hour'
-                WHEN duration_hours <= 4 THEN '1-4 hours'
-                WHEN duration_hours <= 8 THEN '4-8 hours'
-                ELSE '> 8 hours'
-            END as range,
-            COUNT(*) as count
-        FROM campaigns
-        GROUP BY range
-        ORDER BY MIN(duration_hours)
-    ''')
-    duration_distribution = [dict(row) for row in cursor.fetchall()]
+    cached = dashboard_cache.get('charts')
+    if cached is not None:
+        return jsonify(cached)
+
+    with db_pool.borrow() as conn:
+        # By status
+        by_status = rows_as_dicts(conn.execute(SQL['by_status']))
+
+        # By account mode
+        by_mode = rows_as_dicts(conn.execute(SQL['by_mode']))
+
+        # Duration distribution (bucket integer -> label)
+        cursor = conn.execute(SQL['duration_dist'])
+        cursor.row_factory = None
+        duration_distribution = [
+            {'range': DURATION_BUCKET_LABELS[bucket], 'count': count}
+            for bucket, count in cursor.fetchall()
+        ]
 
-    # 30-day trend
-    cursor.execute('''
-        SELECT
-            DATE(created_at) as date,
-            COUNT(*) as count
-        FROM campaigns
-        WHERE created_at >= DATE('now', '-30 days')
-        GROUP BY DATE(created_at)
-        ORDER BY date
-    ''')
-    trend_30days = [dict(row) for row in cursor.fetchall()]
+        # 30-day trend
+        trend_30days = rows_as_dicts(conn.execute(SQL['trend_30d']))
 
-    conn.close()
-    return jsonify({
+    payload = {
         'by_status': by_status,
         'by_mode': by_mode,
         'duration_distribution': duration_distribution,
         'trend_30days': trend_30days
-    })
+    }
+    dashboard_cache.set('charts', payload)
+    return jsonify(payload)
 
-@app.route('/api/campaigns/active')
+@campaigns_bp.route('/api/campaigns/active')
 def get_active_campaigns():
     """Get active campaigns"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute('''
-        SELECT * FROM campaigns
-        WHERE status IN ('pending', 'running')
-        ORDER BY created_at DESC
-        LIMIT 10
-    ''')
-
-    campaigns = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with db_pool.borrow() as conn:
+        campaigns = rows_as_dicts(conn.execute(SQL['active']))
 
     return jsonify(campaigns)
 
-@app.route('/api/campaigns', methods=['POST'])
+@campaigns_bp.route('/api/campaigns', methods=['POST'])
 def create_campaign():
     """Create a new campaign"""
     try:
@@ -206,31 +410,37 @@ def create_campaign():
         if not data or not data.get('name'):
             return jsonify({'error': 'Campaign name is required'}), 400
 
-        # Generate campaign ID
-        campaign_id = str(uuid.uuid4())[:8]
-
-        # Insert campaign
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            INSERT INTO campaigns (
-                id, name, device_id, account_mode,
-                duration_hours, status, current_step
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            campaign_id,
-            data['name'],
-            data.get('device_id'),
-            data.get('account_mode', 'normal'),
-            data.get('duration_hours', 1),
-            'pending',
-            'Waiting to start...'
-        ))
-
-        conn.commit()
-        conn.close()
-
+        # Generate campaign ID: 4 random bytes hex-encoded, same entropy as
+        # the old truncated uuid4 without building a UUID object first
+        campaign_id = secrets.token_hex(4)
+
+        # Clients that create-then-start can do both in one request (and
+        # one transaction) by passing auto_start=true
+        auto_start = bool(data.get('auto_start'))
+
+        # Insert campaign (with conn: gives implicit commit/rollback)
+        with db_pool.borrow() as conn:
+            with conn:
+                if auto_start:
+                    conn.execute(SQL['insert_campaign_running'], (
+                        campaign_id,
+                        data['name'],
+                        data.get('device_id'),
+                        data.get('account_mode', 'normal'),
+                        data.get('duration_hours', 1)
+                    ))
+                else:
+                    conn.execute(SQL['insert_campaign'], (
+                        campaign_id,
+                        data['name'],
+                        data.get('device_id'),
+                        data.get('account_mode', 'normal'),
+                        data.get('duration_hours', 1),
+                        'pending',
+                        'Waiting to start...'
+                    ))
+
+        dashboard_cache.invalidate()
         logger.info(f"Created campaign {campaign_id}: {data['name']}")
 
         # Emit socket event
@@ -239,6 +449,10 @@ def create_campaign():
             'name': data['name']
         })
 
+        if auto_start:
+            socketio.emit('campaign_started', {'campaign_id': campaign_id})
+            socketio.start_background_task(run_campaign, campaign_id)
+
         return jsonify({
             'success': True,
             'campaign_id': campaign_id,
@@ -249,37 +463,26 @@ def create_campaign():
         logger.error(f"Error creating campaign: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<campaign_id>/start', methods=['POST'])
+@campaigns_bp.route('/api/campaigns/<campaign_id>/start', methods=['POST'])
 def start_campaign(campaign_id):
     """Start a campaign"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            UPDATE campaigns
-            SET status = 'running',
-                started_at = CURRENT_TIMESTAMP,
-                current_step = 'Initializing...'
-            WHERE id = ?
-        ''', (campaign_id,))
-
-        if cursor.rowcount == 0:
-            conn.close()
-            return jsonify({'error': 'Campaign not found'}), 404
+        with db_pool.borrow() as conn:
+            with conn:
+                cursor = conn.execute(SQL['start'], (campaign_id,))
 
-        conn.commit()
-        conn.close()
+            if cursor.rowcount == 0:
+                return jsonify({'error': 'Campaign not found'}), 404
 
+        dashboard_cache.invalidate()
         logger.info(f"Started campaign {campaign_id}")
 
         # Emit socket event
         socketio.emit('campaign_started', {'campaign_id': campaign_id})
 
-        # Start campaign in background thread
-        thread = threading.Thread(target=run_campaign, args=(campaign_id,))
-        thread.daemon = True
-        thread.start()
+        # Run in a Socket.IO background task so emits from the runner are
+        # delivered correctly under eventlet/gevent async modes
+        socketio.start_background_task(run_campaign, campaign_id)
 
         return jsonify({'success': True, 'message': 'Campaign started'})
 
@@ -287,19 +490,16 @@ def start_campaign(campaign_id):
         logger.error(f"Error starting campaign: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/campaigns/<campaign_id>', methods=['DELETE'])
+@campaigns_bp.route('/api/campaigns/<campaign_id>', methods=['DELETE'])
 def delete_campaign(campaign_id):
     """Delete a campaign"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('DELETE FROM campaigns WHERE id = ?', (campaign_id,))
-        cursor.execute('DELETE FROM campaign_logs WHERE campaign_id = ?', (campaign_id,))
-
-        conn.commit()
-        conn.close()
+        # Single transaction; campaign_logs rows go away via ON DELETE CASCADE
+        with db_pool.borrow() as conn:
+            with conn:
+                conn.execute(SQL['delete'], (campaign_id,))
 
+        dashboard_cache.invalidate()
         logger.info(f"Deleted campaign {campaign_id}")
 
         return jsonify({'success': True, 'message': 'Campaign deleted'})
@@ -323,34 +523,25 @@ def handle_refresh():
     """Handle dashboard refresh request"""
     emit('dashboard_refreshed', {'message': 'Dashboard refreshed'})
 
+# Campaign steps with their progress percentages, precomputed once at
+# module scope instead of rebuilding the list and dividing per iteration
+STEPS = (
+    ('Initializing GPS tracking...', 14),
+    ('Connecting to device...', 28),
+    ('Starting location tracking...', 42),
+    ('Monitoring activity...', 57),
+    ('Collecting data...', 71),
+    ('Finalizing campaign...', 85),
+    ('Campaign completed!', 100),
+)
+
 # Campaign execution function
 def run_campaign(campaign_id):
     """Run a campaign (simulated for now)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        steps = [
-            'Initializing GPS tracking...',
-            'Connecting to device...',
-            'Starting location tracking...',
-            'Monitoring activity...',
-            'Collecting data...',
-            'Finalizing campaign...',
-            'Campaign completed!'
-        ]
-
-        for i, step in enumerate(steps):
-            # Update progress
-            progress = int((i + 1) / len(steps) * 100)
-
-            cursor.execute('''
-                UPDATE campaigns
-                SET current_step = ?, progress = ?
-                WHERE id = ?
-            ''', (step, progress, campaign_id))
-
-            conn.commit()
+        for step, progress in STEPS:
+            # Intermediate steps are broadcast over Socket.IO only and
+            # don't need an fsync each.
 
             # Emit socket event
             socketio.emit('campaign_progress', {
@@ -359,21 +550,23 @@ def run_campaign(campaign_id):
                 'progress': progress
             })
 
-            # Simulate work
-            import time
-            time.sleep(2)
-
-        # Mark as completed
-        cursor.execute('''
-            UPDATE campaigns
-            SET status = 'completed',
-                completed_at = CURRENT_TIMESTAMP,
-                progress = 100
-            WHERE id = ?
-        ''', (campaign_id,))
-        conn.commit()
-        conn.close()
-
+            # Simulate work (socketio.sleep yields to the event loop
+            # under eventlet/gevent, falling back to time.sleep)
+            socketio.sleep(2)
+
+        # Mark as completed: one transaction persists the final state
+        # and bulk-inserts the step log in a single prepared statement.
+        # The connection is borrowed only here — holding it through the
+        # sleeps above would starve the pool under concurrent campaigns
+        with db_pool.borrow() as conn:
+            with conn:
+                conn.execute(SQL['complete'], (STEPS[-1][0], campaign_id))
+                conn.executemany(
+                    SQL['insert_logs'],
+                    [(campaign_id, 'INFO', step) for step, _ in STEPS]
+                )
+
+        dashboard_cache.invalidate()
         logger.info(f"Campaign {campaign_id} completed")
 
         # Emit completion event
@@ -386,21 +579,35 @@ def run_campaign(campaign_id):
         logger.error(f"Error running campaign {campaign_id}: {str(e)}")
 
         # Mark as failed
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE campaigns
-            SET status = 'failed',
-                error_message = ?
-            WHERE id = ?
-        ''', (str(e), campaign_id))
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            with conn:
+                conn.execute(SQL['fail'], (str(e), campaign_id))
+        dashboard_cache.invalidate()
+
+# Application factory
+def create_app():
+    """Build the Flask app: one URL map, one Socket.IO binding"""
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    app.config['SECRET_KEY'] = 'gps-campaign-manager-secret-key'
+    app.register_blueprint(campaigns_bp)
+    socketio.init_app(app)
+    init_db()
+    return app
+
+# Module-level app for production servers. The dots in this filename break
+# gunicorn's "module:app" import syntax, so serve through the wsgi.py
+# wrapper instead:
+#   gunicorn -k eventlet -w 1 "wsgi:app"
+# (Socket.IO needs a single worker unless a message queue and sticky
+# sessions are configured.)
+app = create_app()
 
 if __name__ == '__main__':
-    # Initialize database
-    init_db()
+    # Direct execution is the development entry point; production should go
+    # through gunicorn/eventlet instead of the Werkzeug dev server.
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    port = int(os.environ.get('PORT', 5002))
 
-    # Run the app
     logger.info("Starting GPS Campaign Manager v2.2")
-    socketio.run(app, host='0.0.0.0', port=5002, debug=True, allow_unsafe_werkzeug=True)
+    socketio.run(app, host='0.0.0.0', port=port, debug=debug, allow_unsafe_werkzeug=True)
@@ -12,12 +12,28 @@ import logging
 import math
 import time
 import threading
-from datetime import datetime, timedelta
+import queue
+import heapq
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import List, Dict, Optional, Tuple
 
+import hashlib
+
 import bcrypt
 import jwt
+import numpy as np
+import orjson
+
+try:
+    import numba
+except ImportError:  # numba is optional; the NumPy paths below still work
+    numba = None
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
 from flask import (
     Flask, jsonify, request, render_template, g
 )
@@ -31,6 +47,25 @@ logger = logging.getLogger("gps_campaign_manager_v3")
 SECRET_KEY = "gps-campaign-manager-secret-key-change-in-production"
 TOKEN_EXPIRATION_HOURS = 24
 
+# argon2id replaces bcrypt for new hashes: memory-hardness gives better
+# security per millisecond of verify time, and the parallelism parameter
+# uses multiple lanes per hash. Legacy $2b$ bcrypt hashes still verify and
+# are rehashed to argon2 on the next successful login.
+PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+# Password hashing runs in subprocesses so concurrent logins/registrations
+# use all cores and never monopolize the serving worker for the hash time
+HASH_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+def _argon2_hash(password: str) -> str:
+    return PASSWORD_HASHER.hash(password)
+
+def _argon2_verify(hashed: str, password: str) -> bool:
+    try:
+        return PASSWORD_HASHER.verify(hashed, password)
+    except VerificationError:
+        return False
+
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), 'campaigns.db')
 
@@ -38,30 +73,93 @@ DB_PATH = os.path.join(os.path.dirname(__file__), 'campaigns.db')
 template_dir = os.path.join(os.path.dirname(__file__), 'gps_campaign_manager', 'app', 'templates')
 app = Flask(__name__, template_folder=template_dir)
 app.config['SECRET_KEY'] = SECRET_KEY
-socketio = SocketIO(app, cors_allowed_origins="*")
+class _OrjsonModule:
+    """json-module shim so python-socketio serializes frames with orjson"""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
+
+socketio = SocketIO(app, cors_allowed_origins="*", json=_OrjsonModule)
 
 # === Utility ===
 import sqlite3
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+    conn = sqlite3.connect(DB_PATH, timeout=30.0, check_same_thread=False)
     conn.row_factory = sqlite3.Row
-    # Enable WAL mode for better concurrent access
+    # WAL lets readers run concurrently with the single writer;
+    # synchronous=NORMAL is durable enough in WAL mode and skips an
+    # fsync per transaction. Cache/mmap sizes are per-connection and
+    # amortized because connections live in the pool.
     conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
     conn.execute('PRAGMA busy_timeout=30000')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA foreign_keys=ON')
     return conn
 
+class ConnectionPool:
+    """Bounded pool of pre-opened SQLite connections.
+
+    AuthManager, DeviceRegistry, CampaignWorkflow and LiveLogger used to
+    open and close a connection per call, paying the file-open and
+    page-cache setup cost on every hot-path operation. The pool warms a
+    fixed set of connections at startup and hands them out via borrow().
+    """
+
+    def __init__(self, size=8):
+        self._pool = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(get_db_connection())
+
+    @contextmanager
+    def borrow(self):
+        """Borrow a pooled connection, returning it when done"""
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            # Never hand back a connection mid-transaction: an exception
+            # between execute() and commit() would otherwise leak partial
+            # writes into the next borrower's commit/rollback
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+db_pool = ConnectionPool()
+
 # === Authentication Manager ===
 
 class AuthManager:
+    # Verified-token cache: HS256 verify + JSON parse runs on every request
+    # and Socket.IO event, but tokens rarely change between requests. Short
+    # TTL keeps revocation latency bounded; the payload's own exp is still
+    # honored on every hit.
+    TOKEN_CACHE_TTL_SECONDS = 30
+    TOKEN_CACHE_MAX_ENTRIES = 10000
+
     def __init__(self):
-        pass
+        self._token_cache = {}
+        self._token_cache_lock = threading.Lock()
 
     def hash_password(self, password: str) -> str:
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        return HASH_POOL.submit(_argon2_hash, password).result()
 
     def verify_password(self, password: str, hashed: str) -> bool:
-        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+        if hashed.startswith('$argon2'):
+            return HASH_POOL.submit(_argon2_verify, hashed, password).result()
+        # Legacy bcrypt hash
+        return HASH_POOL.submit(
+            bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8')
+        ).result()
 
     def generate_token(self, user_id: str, username: str, role: str = 'user') -> str:
         payload = {
@@ -75,13 +173,27 @@ class AuthManager:
         return token
 
     def decode_token(self, token: str) -> Optional[dict]:
+        # Key on a token digest rather than the raw token string
+        key = hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+        now = time.time()
+        with self._token_cache_lock:
+            entry = self._token_cache.get(key)
+            if entry and now < entry[0]:
+                payload = entry[1]
+                if payload.get('exp', 0) > now:
+                    return payload
+                del self._token_cache[key]
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-            return payload
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        with self._token_cache_lock:
+            if len(self._token_cache) >= self.TOKEN_CACHE_MAX_ENTRIES:
+                self._token_cache.clear()
+            self._token_cache[key] = (now + self.TOKEN_CACHE_TTL_SECONDS, payload)
+        return payload
 
     def register_user(self, username: str, email: str, password: str, role: str = 'user') -> Tuple[bool, str, Optional[str]]:
         if not username or not email or not password:
@@ -90,43 +202,50 @@ class AuthManager:
             return False, "Username must be at least 3 characters", None
         if len(password) < 6:
             return False, "Password must be at least 6 characters", None
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM users WHERE username = ? OR email = ?', (username, email))
-        if cursor.fetchone():
-            conn.close()
-            return False, "Username or email already exists", None
-        user_id = str(uuid.uuid4())
-        password_hash = self.hash_password(password)
-        cursor.execute('''
-            INSERT INTO users (id, username, email, password_hash, role)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (user_id, username, email, password_hash, role))
-        cursor.execute('INSERT INTO user_settings (user_id) VALUES (?)', (user_id,))
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id FROM users WHERE username = ? OR email = ?', (username, email))
+            if cursor.fetchone():
+                return False, "Username or email already exists", None
+            user_id = str(uuid.uuid4())
+            password_hash = self.hash_password(password)
+            cursor.execute('''
+                INSERT INTO users (id, username, email, password_hash, role)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (user_id, username, email, password_hash, role))
+            cursor.execute('INSERT INTO user_settings (user_id) VALUES (?)', (user_id,))
+            conn.commit()
         logger.info(f"New user registered: {username} ({email})")
         return True, "User registered successfully", user_id
 
     def login_user(self, username: str, password: str) -> Tuple[bool, str, Optional[Dict], Optional[str]]:
         if not username or not password:
             return False, "Missing username or password", None, None
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT id, username, email, password_hash, role, created_at
-            FROM users WHERE username = ? OR email = ?
-        ''', (username, username))
-        user = cursor.fetchone()
-        if not user:
-            conn.close()
-            return False, "Invalid credentials", None, None
-        if not self.verify_password(password, user["password_hash"]):
-            conn.close()
-            return False, "Invalid credentials", None, None
-        cursor.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user["id"],))
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.cursor()
+            # UNION ALL lets each branch hit its own index; OR forces a scan
+            cursor.execute('''
+                SELECT id, username, email, password_hash, role, created_at
+                FROM users WHERE username = ?
+                UNION ALL
+                SELECT id, username, email, password_hash, role, created_at
+                FROM users WHERE email = ?
+                LIMIT 1
+            ''', (username, username))
+            user = cursor.fetchone()
+            if not user:
+                return False, "Invalid credentials", None, None
+            if not self.verify_password(password, user["password_hash"]):
+                return False, "Invalid credentials", None, None
+            # Migrate legacy bcrypt hashes (and argon2 hashes with stale
+            # parameters) now that we hold the verified plaintext
+            stored_hash = user["password_hash"]
+            if (not stored_hash.startswith('$argon2')
+                    or PASSWORD_HASHER.check_needs_rehash(stored_hash)):
+                cursor.execute('UPDATE users SET password_hash = ? WHERE id = ?',
+                               (self.hash_password(password), user["id"]))
+            cursor.execute('UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?', (user["id"],))
+            conn.commit()
         token = self.generate_token(user["id"], user["username"], user["role"])
         user_dict = {
             'id': user['id'],
@@ -147,10 +266,9 @@ auth_manager = AuthManager()
 def require_auth(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization', '')
-        if not auth_header:
-            return jsonify({'error': 'No token provided'}), 401
-        token = auth_header.replace('Bearer ', '')
+        # removeprefix only strips a leading "Bearer ", unlike replace()
+        # which would mangle tokens containing that substring
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
         if not token:
             return jsonify({'error': 'No token provided'}), 401
         payload = auth_manager.decode_token(token)
@@ -185,26 +303,54 @@ class DeviceSyncStatus(Enum):
 class DeviceRegistry:
     SYNC_TIMEOUT_SECONDS = 60
 
+    def __init__(self):
+        # Min-heap of (deadline, adb_device_id) fed by update_sync_status so
+        # the timeout sweep only touches devices whose deadline has passed
+        # instead of scanning the whole table every tick
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._expiry_lock = threading.Lock()
+        self._seed_expiry_heap()
+
+    def _seed_expiry_heap(self):
+        """Re-arm deadlines for devices left 'online' by a previous process
+
+        The heap only learns about devices through update_sync_status, so
+        without seeding, rows marked online before a restart would never
+        time out.
+        """
+        try:
+            with db_pool.borrow() as conn:
+                rows = conn.execute(
+                    "SELECT adb_device_id, last_sync FROM devices WHERE sync_status = 'online'"
+                ).fetchall()
+        except sqlite3.OperationalError:
+            # Fresh database: tables are created later by init_db()
+            return
+        now = datetime.now()
+        for row in rows:
+            try:
+                last_sync = datetime.fromisoformat(row['last_sync']) if row['last_sync'] else now
+            except (TypeError, ValueError):
+                last_sync = now
+            deadline = last_sync + timedelta(seconds=self.SYNC_TIMEOUT_SECONDS)
+            heapq.heappush(self._expiry_heap, (deadline, row['adb_device_id']))
+
     def register_device(self, user_id: str, name: str, adb_device_id: str, proxy_ip: Optional[str] = None, initial_script: str = DeviceScript.NONE.value) -> Tuple[bool, str, Optional[str]]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM devices WHERE adb_device_id = ?', (adb_device_id,))
-        if cursor.fetchone():
-            conn.close()
-            return False, "ADB device ID already registered", None
-        device_id = str(uuid.uuid4())
-        cursor.execute('''
-            INSERT INTO devices (id, user_id, name, adb_device_id, proxy_ip, current_script, sync_status, last_sync)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (device_id, user_id, name, adb_device_id, proxy_ip, initial_script, DeviceSyncStatus.UNKNOWN.value, None))
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id FROM devices WHERE adb_device_id = ?', (adb_device_id,))
+            if cursor.fetchone():
+                return False, "ADB device ID already registered", None
+            device_id = str(uuid.uuid4())
+            cursor.execute('''
+                INSERT INTO devices (id, user_id, name, adb_device_id, proxy_ip, current_script, sync_status, last_sync)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (device_id, user_id, name, adb_device_id, proxy_ip, initial_script, DeviceSyncStatus.UNKNOWN.value, None))
+            conn.commit()
         logger.info(f"Device registered: {name} ({adb_device_id}) by user {user_id}")
         return True, "Device registered successfully", device_id
 
     def update_device(self, device_id: str, **kwargs) -> Tuple[bool, str]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
         valid_fields = ['name', 'proxy_ip', 'current_script', 'sync_status', 'last_sync']
         updates = []
         params = []
@@ -213,60 +359,53 @@ class DeviceRegistry:
                 updates.append(f"{field} = ?")
                 params.append(value)
         if not updates:
-            conn.close()
             return False, "No valid fields to update"
         params.append(device_id)
         query = f"UPDATE devices SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            conn.execute(query, params)
+            conn.commit()
         logger.debug(f"Device {device_id} updated: {kwargs}")
         return True, "Device updated"
 
     def get_device(self, device_id: str) -> Optional[Dict]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM devices WHERE id = ?', (device_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with db_pool.borrow() as conn:
+            result = conn.execute('SELECT * FROM devices WHERE id = ?', (device_id,)).fetchone()
         return dict(result) if result else None
 
     def get_device_by_adb_id(self, adb_device_id: str) -> Optional[Dict]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM devices WHERE adb_device_id = ?', (adb_device_id,))
-        result = cursor.fetchone()
-        conn.close()
+        with db_pool.borrow() as conn:
+            result = conn.execute('SELECT * FROM devices WHERE adb_device_id = ?', (adb_device_id,)).fetchone()
         return dict(result) if result else None
 
     def list_user_devices(self, user_id: str) -> List[Dict]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM devices WHERE user_id = ? ORDER BY created_at DESC', (user_id,))
-        devices = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.execute('SELECT * FROM devices WHERE user_id = ? ORDER BY created_at DESC', (user_id,))
+            devices = [dict(row) for row in cursor.fetchall()]
         return devices
 
     def delete_device(self, device_id: str, user_id: str) -> Tuple[bool, str]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT user_id FROM devices WHERE id = ?', (device_id,))
-        result = cursor.fetchone()
-        if not result:
-            conn.close()
-            return False, "Device not found"
-        if result["user_id"] != user_id:
-            conn.close()
-            return False, "You don't own this device"
-        cursor.execute('''
-            SELECT COUNT(*) FROM campaigns WHERE device_id = ? AND status IN ('processing', 'cooldown')
-        ''', (device_id,))
-        if cursor.fetchone()[0] > 0:
-            conn.close()
-            return False, "Device is currently in use"
-        cursor.execute('DELETE FROM devices WHERE id = ?', (device_id,))
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.cursor()
+            # One conditional DELETE covers the happy path; only classify the
+            # failure (and pay the extra lookups) when nothing was deleted
+            cursor.execute('''
+                DELETE FROM devices
+                WHERE id = ? AND user_id = ?
+                AND NOT EXISTS (
+                    SELECT 1 FROM campaigns
+                    WHERE device_id = devices.id AND status IN ('processing', 'cooldown')
+                )
+            ''', (device_id, user_id))
+            conn.commit()
+            if cursor.rowcount == 0:
+                cursor.execute('SELECT user_id FROM devices WHERE id = ?', (device_id,))
+                result = cursor.fetchone()
+                if not result:
+                    return False, "Device not found"
+                if result["user_id"] != user_id:
+                    return False, "You don't own this device"
+                return False, "Device is currently in use"
         logger.info(f"Device {device_id} deleted by user {user_id}")
         return True, "Device deleted"
 
@@ -293,38 +432,53 @@ class DeviceRegistry:
         return self.update_device(device_id, current_script=script_type)
 
     def update_sync_status(self, adb_device_id: str, status: str) -> Tuple[bool, str]:
-        device = self.get_device_by_adb_id(adb_device_id)
-        if not device:
-            return False, "Device not found in registry"
         now = datetime.now()
-        return self.update_device(device['id'], sync_status=status, last_sync=now)
+        with db_pool.borrow() as conn:
+            cursor = conn.execute('''
+                UPDATE devices SET sync_status = ?, last_sync = ? WHERE adb_device_id = ?
+            ''', (status, now, adb_device_id))
+            conn.commit()
+        if cursor.rowcount == 0:
+            return False, "Device not found in registry"
+        if status == DeviceSyncStatus.ONLINE.value:
+            deadline = now + timedelta(seconds=self.SYNC_TIMEOUT_SECONDS)
+            with self._expiry_lock:
+                heapq.heappush(self._expiry_heap, (deadline, adb_device_id))
+        return True, "Device updated"
 
     def check_all_device_sync(self) -> int:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        timeout_time = datetime.now() - timedelta(seconds=self.SYNC_TIMEOUT_SECONDS)
-        cursor.execute('''
-            UPDATE devices SET sync_status = 'offline'
-            WHERE sync_status = 'online' AND last_sync < ?
-        ''', (timeout_time,))
-        offline_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        now = datetime.now()
+        timeout_time = now - timedelta(seconds=self.SYNC_TIMEOUT_SECONDS)
+        expired = []
+        with self._expiry_lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expired.append(heapq.heappop(self._expiry_heap)[1])
+        if not expired:
+            return 0
+        offline_count = 0
+        with db_pool.borrow() as conn:
+            for adb_device_id in expired:
+                # last_sync guard skips devices that re-synced after this
+                # heap entry was pushed (a fresher entry still covers them)
+                cursor = conn.execute('''
+                    UPDATE devices SET sync_status = 'offline'
+                    WHERE adb_device_id = ? AND sync_status = 'online' AND last_sync < ?
+                ''', (adb_device_id, timeout_time))
+                offline_count += cursor.rowcount
+            conn.commit()
         if offline_count > 0:
             logger.info(f"Marked {offline_count} devices as offline (timeout)")
         return offline_count
 
     def get_available_devices(self, user_id: str) -> List[Dict]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT * FROM devices
-            WHERE user_id = ? AND (current_script = 'none' OR current_script = 'gps')
-            AND sync_status = 'online'
-            ORDER BY name ASC
-        ''', (user_id,))
-        devices = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with db_pool.borrow() as conn:
+            cursor = conn.execute('''
+                SELECT * FROM devices
+                WHERE user_id = ? AND (current_script = 'none' OR current_script = 'gps')
+                AND sync_status = 'online'
+                ORDER BY name ASC
+            ''', (user_id,))
+            devices = [dict(row) for row in cursor.fetchall()]
         return devices
 
 # === Campaign Workflow ===
@@ -337,76 +491,72 @@ class CampaignStatus(Enum):
 
 class CampaignWorkflow:
     TRANSITIONS = {
-        CampaignStatus.QUEUED: [CampaignStatus.PROCESSING],
-        CampaignStatus.PROCESSING: [CampaignStatus.COOLDOWN, CampaignStatus.FAILED],
-        CampaignStatus.COOLDOWN: [CampaignStatus.COMPLETED, CampaignStatus.FAILED],
-        CampaignStatus.COMPLETED: [],
-        CampaignStatus.FAILED: []
+        CampaignStatus.QUEUED: (CampaignStatus.PROCESSING,),
+        CampaignStatus.PROCESSING: (CampaignStatus.COOLDOWN, CampaignStatus.FAILED),
+        CampaignStatus.COOLDOWN: (CampaignStatus.COMPLETED, CampaignStatus.FAILED),
+        CampaignStatus.COMPLETED: (),
+        CampaignStatus.FAILED: ()
     }
 
+    # Flattened (current, new) value pairs: one hashed membership test per
+    # check, no enum construction or try/except on the hot path
+    _ALLOWED = frozenset(
+        (current.value, new.value)
+        for current, targets in TRANSITIONS.items()
+        for new in targets
+    )
+
     COOLDOWN_MINUTES = 30
 
     def can_transition(self, current_status: str, new_status: str) -> bool:
-        try:
-            current = CampaignStatus(current_status)
-            new = CampaignStatus(new_status)
-            return new in self.TRANSITIONS.get(current, [])
-        except ValueError:
-            return False
+        return (current_status, new_status) in self._ALLOWED
 
     def transition_status(self, campaign_id: str, new_status: str, error_message: Optional[str] = None) -> Tuple[bool, str]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT status FROM campaigns WHERE id = ?', (campaign_id,))
-        result = cursor.fetchone()
-        if not result:
-            conn.close()
-            return False, "Campaign not found"
-        current_status = result['status']
-        if not self.can_transition(current_status, new_status):
-            conn.close()
-            return False, f"Invalid transition: {current_status} 12 {new_status}"
-        now = datetime.now()
-        if new_status == CampaignStatus.PROCESSING.value:
-            query = '''
-            UPDATE campaigns SET status = ?, queued_at = COALESCE(queued_at, ?), processing_at = ?, current_step = 'Processing...'
-            WHERE id = ?
-            '''
-            params = (new_status, now, now, campaign_id)
-        elif new_status == CampaignStatus.COOLDOWN.value:
-            cooldown_until = now + timedelta(minutes=self.COOLDOWN_MINUTES)
-            query = '''
-            UPDATE campaigns SET status = ?, cooldown_until = ?, current_step = 'Cooldown period...'
-            WHERE id = ?
-            '''
-            params = (new_status, cooldown_until, campaign_id)
-        elif new_status == CampaignStatus.COMPLETED.value:
-            query = '''
-            UPDATE campaigns SET status = ?, completed_at = ?, current_step = 'Completed', progress = 100
-            WHERE id = ?
-            '''
-            params = (new_status, now, campaign_id)
-        elif new_status == CampaignStatus.FAILED.value:
-            query = '''
-            UPDATE campaigns SET status = ?, error_message = ?, current_step = 'Failed'
-            WHERE id = ?
-            '''
-            params = (new_status, error_message or 'Unknown error', campaign_id)
-        else:
-            conn.close()
-            return False, f"Unknown status: {new_status}"
-        cursor.execute(query, params)
-        conn.commit()
-        conn.close()
+        with db_pool.borrow() as conn:
+            result = conn.execute('SELECT status FROM campaigns WHERE id = ?', (campaign_id,)).fetchone()
+            if not result:
+                return False, "Campaign not found"
+            current_status = result['status']
+            if not self.can_transition(current_status, new_status):
+                return False, f"Invalid transition: {current_status} 12 {new_status}"
+            # CURRENT_TIMESTAMP lets SQLite stamp the row directly; Python
+            # only computes cooldown_until, which needs timedelta arithmetic
+            if new_status == CampaignStatus.PROCESSING.value:
+                query = '''
+                UPDATE campaigns SET status = ?, queued_at = COALESCE(queued_at, CURRENT_TIMESTAMP),
+                processing_at = CURRENT_TIMESTAMP, current_step = 'Processing...'
+                WHERE id = ?
+                '''
+                params = (new_status, campaign_id)
+            elif new_status == CampaignStatus.COOLDOWN.value:
+                cooldown_until = datetime.now() + timedelta(minutes=self.COOLDOWN_MINUTES)
+                query = '''
+                UPDATE campaigns SET status = ?, cooldown_until = ?, current_step = 'Cooldown period...'
+                WHERE id = ?
+                '''
+                params = (new_status, cooldown_until, campaign_id)
+            elif new_status == CampaignStatus.COMPLETED.value:
+                query = '''
+                UPDATE campaigns SET status = ?, completed_at = CURRENT_TIMESTAMP, current_step = 'Completed', progress = 100
+                WHERE id = ?
+                '''
+                params = (new_status, campaign_id)
+            elif new_status == CampaignStatus.FAILED.value:
+                query = '''
+                UPDATE campaigns SET status = ?, error_message = ?, current_step = 'Failed'
+                WHERE id = ?
+                '''
+                params = (new_status, error_message or 'Unknown error', campaign_id)
+            else:
+                return False, f"Unknown status: {new_status}"
+            conn.execute(query, params)
+            conn.commit()
         logger.info(f"Campaign {campaign_id}: {current_status} 12 {new_status}")
         return True, f"Status updated to {new_status}"
 
     def check_cooldown_complete(self, campaign_id: str) -> bool:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT cooldown_until FROM campaigns WHERE id = ? AND status = ?', (campaign_id, CampaignStatus.COOLDOWN.value))
-        result = cursor.fetchone()
-        conn.close()
+        with db_pool.borrow() as conn:
+            result = conn.execute('SELECT cooldown_until FROM campaigns WHERE id = ? AND status = ?', (campaign_id, CampaignStatus.COOLDOWN.value)).fetchone()
         if not result or not result['cooldown_until']:
             return False
         cooldown_until = datetime.fromisoformat(result['cooldown_until'])
@@ -419,29 +569,106 @@ class CampaignWorkflow:
 
 # === Live Logger ===
 class LiveLogger:
+    # Log rows are buffered in memory and flushed in executemany batches,
+    # so N add_log calls cost one commit (one fsync) instead of N
+    FLUSH_INTERVAL_SECONDS = 0.1
+    FLUSH_BATCH_SIZE = 64
+
+    # timestamp is omitted: the schema's CURRENT_TIMESTAMP default stamps the
+    # row at flush time, within FLUSH_INTERVAL_SECONDS of the add_log call
+    INSERT_SQL = '''
+        INSERT INTO execution_logs (campaign_id, level, message, device_id)
+        VALUES (?, ?, ?, ?)
+    '''
+
+    RECENT_MAXLEN = 1024
+
     def __init__(self):
-        pass
+        self._buf = deque()
+        # Last RECENT_MAXLEN entries per campaign, newest last; serves the
+        # dashboard's poll without touching SQLite
+        self._recent: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.RECENT_MAXLEN))
+        # Second-resolution isoformat cache: log bursts share one strftime
+        self._ts_second = 0
+        self._ts_iso = ''
+        self._flush_lock = threading.Lock()
+        # Dedicated writer connection in autocommit mode: flushes never
+        # contend with the pool, and transaction scope is explicit below
+        self._write_conn = sqlite3.connect(
+            DB_PATH, timeout=30.0, check_same_thread=False, isolation_level=None
+        )
+        self._write_conn.execute('PRAGMA journal_mode=WAL')
+        self._write_conn.execute('PRAGMA busy_timeout=30000')
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
 
-    def add_log(self, campaign_id: str, level: str, message: str, device_id: Optional[str] = None) -> bool:
+    def add_log(self, campaign_id: str, level: str, message: str, device_id: Optional[str] = None, durable: bool = False) -> bool:
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO execution_logs (campaign_id, level, message, device_id, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (campaign_id, level, message, device_id, datetime.now()))
-            conn.commit()
-            conn.close()
+            # Emit first: subscribers see the line immediately instead of
+            # waiting behind the SQLite commit
             self.emit_log(campaign_id, level, message, device_id)
+            self._buf.append((campaign_id, level, message, device_id))
+            # Same keys and order as an execution_logs row; id is assigned
+            # by SQLite at flush time and unknown here
+            self._recent[campaign_id].append({
+                'id': None,
+                'campaign_id': campaign_id,
+                'level': level,
+                'message': message,
+                'device_id': device_id,
+                'timestamp': self._now_iso()
+            })
+            if durable or len(self._buf) >= self.FLUSH_BATCH_SIZE:
+                self.flush()
             return True
         except Exception as e:
             logger.error(f"Failed to add log: {str(e)}")
             return False
 
+    def flush(self):
+        """Write all buffered log rows in one batch/transaction"""
+        with self._flush_lock:
+            rows = []
+            while True:
+                try:
+                    rows.append(self._buf.popleft())
+                except IndexError:
+                    break
+            if not rows:
+                return
+            # BEGIN IMMEDIATE takes the write lock up front so the batch
+            # cannot deadlock against a reader upgrading mid-transaction
+            self._write_conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._write_conn.executemany(self.INSERT_SQL, rows)
+                self._write_conn.execute('COMMIT')
+            except Exception:
+                self._write_conn.execute('ROLLBACK')
+                raise
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.FLUSH_INTERVAL_SECONDS)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Log flush failed: {str(e)}")
+
+    def _now_iso(self) -> str:
+        # UTC in the DB's CURRENT_TIMESTAMP format, so buffered entries and
+        # SQL rows carry identically shaped timestamps
+        second = int(time.time())
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_iso = datetime.fromtimestamp(
+                second, tz=timezone.utc
+            ).strftime('%Y-%m-%d %H:%M:%S')
+        return self._ts_iso
+
     def emit_log(self, campaign_id: str, level: str, message: str, device_id: Optional[str] = None):
         log_entry = {
             'campaign_id': campaign_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._now_iso(),
             'level': level,
             'message': message,
             'device_id': device_id
@@ -450,17 +677,50 @@ class LiveLogger:
         logger.debug(f"Emitted log to campaign {campaign_id}: {message}")
 
     def get_logs(self, campaign_id: str, limit: int = 100, level: Optional[str] = None) -> List[Dict]:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        if level:
-            cursor.execute('SELECT * FROM execution_logs WHERE campaign_id = ? AND level = ? ORDER BY timestamp DESC LIMIT ?', (campaign_id, level, limit))
-        else:
-            cursor.execute('SELECT * FROM execution_logs WHERE campaign_id = ? ORDER BY timestamp DESC LIMIT ?', (campaign_id, limit))
-        logs = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        # Hot path: serve newest-first from the in-process ring buffer and
+        # only fall back to SQLite when it cannot satisfy the request
+        recent = self._recent.get(campaign_id)
+        if recent and len(recent) >= limit:
+            entries = [entry for entry in reversed(list(recent))
+                       if level is None or entry['level'] == level]
+            if len(entries) >= limit:
+                return entries[:limit]
+        # Flush pending rows first so readers see their own writes
+        self.flush()
+        with db_pool.borrow() as conn:
+            if level:
+                cursor = conn.execute('SELECT * FROM execution_logs WHERE campaign_id = ? AND level = ? ORDER BY timestamp DESC LIMIT ?', (campaign_id, level, limit))
+            else:
+                cursor = conn.execute('SELECT * FROM execution_logs WHERE campaign_id = ? ORDER BY timestamp DESC LIMIT ?', (campaign_id, limit))
+            logs = [dict(row) for row in cursor.fetchall()]
         return logs
 
 # === Location Simulator ===
+def _haversine(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    lat1 = math.radians(lat1)
+    lng1 = math.radians(lng1)
+    lat2 = math.radians(lat2)
+    lng2 = math.radians(lng2)
+    d_lat = lat2 - lat1
+    d_lng = lng2 - lng1
+    a = math.sin(d_lat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(d_lng/2)**2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def _interp(lat1: float, lng1: float, lat2: float, lng2: float, n: int, out):
+    for i in range(n + 1):
+        ratio = i / n
+        out[i, 0] = lat1 + (lat2 - lat1) * ratio
+        out[i, 1] = lng1 + (lng2 - lng1) * ratio
+    return out
+
+
+if numba is not None:
+    # cache=True pays the compile cost once per machine, not per process
+    _haversine = numba.njit(fastmath=True, cache=True)(_haversine)
+    _interp = numba.njit(fastmath=True, cache=True)(_interp)
+
+
 class LocationSimulator:
     EARTH_RADIUS = 6371
 
@@ -469,23 +729,25 @@ class LocationSimulator:
         self.running = False
 
     def calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-        lat1, lng1, lat2, lng2 = map(math.radians, [lat1, lng1, lat2, lng2])
+        # Accepts scalars or equal-length arrays; haversine over the whole input
+        if np.isscalar(lat1):
+            return _haversine(float(lat1), float(lng1), float(lat2), float(lng2))
+        lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
         d_lat = lat2 - lat1
         d_lng = lng2 - lng1
-        a = math.sin(d_lat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(d_lng/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        return self.EARTH_RADIUS * c
+        a = np.sin(d_lat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(d_lng/2)**2
+        c = 2 * np.arcsin(np.sqrt(a))
+        distance = self.EARTH_RADIUS * c
+        return float(distance) if np.ndim(distance) == 0 else distance
 
     def interpolate_route(self, start_pos: Tuple[float, float], end_pos: Tuple[float, float], num_points: int) -> List[Tuple[float, float]]:
-        lat1, lng1 = start_pos
-        lat2, lng2 = end_pos
-        points = []
-        for i in range(num_points + 1):
-            ratio = i / num_points
-            lat = lat1 + (lat2 - lat1) * ratio
-            lng = lng1 + (lng2 - lng1) * ratio
-            points.append((lat, lng))
-        return points
+        if numba is not None:
+            out = np.empty((num_points + 1, 2), dtype=np.float64)
+            _interp(start_pos[0], start_pos[1], end_pos[0], end_pos[1], num_points, out)
+            return [tuple(point) for point in out.tolist()]
+        lats = np.linspace(start_pos[0], end_pos[0], num_points + 1)
+        lngs = np.linspace(start_pos[1], end_pos[1], num_points + 1)
+        return list(zip(lats.tolist(), lngs.tolist()))
 
     def simulate_movement(self, route: List[Tuple[float, float]], speed_kmh: float = 5.0, update_interval: int = 2, progress_callback: Optional[callable] = None) -> bool:
         self.running = True
@@ -520,107 +782,83 @@ class LocationSimulator:
 
 # === Initialize Database Tables ===
 
-def init_auth_tables():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT DEFAULT 'user',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP
-        )
-    ''')
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS user_settings (
-            user_id TEXT PRIMARY KEY,
-            default_account_mode TEXT DEFAULT 'normal',
-            default_duration INTEGER DEFAULT 4,
-            preferred_device_id TEXT,
-            notification_enabled BOOLEAN DEFAULT TRUE,
-            timezone TEXT DEFAULT 'UTC',
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-
-def init_device_tables():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS devices (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            adb_device_id TEXT UNIQUE NOT NULL,
-            proxy_ip TEXT,
-            current_script TEXT DEFAULT 'none' CHECK(current_script IN ('gps', 'music', 'none')),
-            sync_status TEXT DEFAULT 'unknown' CHECK(sync_status IN ('online', 'offline', 'unknown')),
-            last_sync TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users(id)
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-
-def init_campaign_tables():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS campaigns (
-            id TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            name TEXT NOT NULL,
-            device_id TEXT,
-            account_mode TEXT,
-            duration_hours INTEGER,
-            status TEXT DEFAULT 'queued' CHECK(status IN ('queued', 'processing', 'cooldown', 'completed', 'failed')),
-            current_step TEXT,
-            progress REAL DEFAULT 0,
-            queued_at TIMESTAMP,
-            processing_at TIMESTAMP,
-            cooldown_until TIMESTAMP,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            started_at TIMESTAMP,
-            completed_at TIMESTAMP,
-            error_message TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (device_id) REFERENCES devices(id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status)
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS execution_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            campaign_id TEXT NOT NULL,
-            level TEXT NOT NULL CHECK(level IN ('debug', 'info', 'warning', 'error')),
-            message TEXT NOT NULL,
-            device_id TEXT,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (campaign_id) REFERENCES campaigns(id),
-            FOREIGN KEY (device_id) REFERENCES devices(id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_logs_campaign_timestamp ON execution_logs(campaign_id, timestamp DESC)
-    ''')
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_logs_device_timestamp ON execution_logs(device_id, timestamp DESC)
-    ''')
-    conn.commit()
-    conn.close()
+# Whole schema in one script: executescript runs it inside a single implicit
+# transaction, one parse pass, one fsync on startup
+SCHEMA_DDL = '''
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT DEFAULT 'user',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_login TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS user_settings (
+        user_id TEXT PRIMARY KEY,
+        default_account_mode TEXT DEFAULT 'normal',
+        default_duration INTEGER DEFAULT 4,
+        preferred_device_id TEXT,
+        notification_enabled BOOLEAN DEFAULT TRUE,
+        timezone TEXT DEFAULT 'UTC',
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    );
+    -- The UNIQUE constraints already create indexes, but name explicit ones so
+    -- the login UNION ALL query plans stay covered across schema migrations
+    CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
+    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+
+    CREATE TABLE IF NOT EXISTS devices (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        adb_device_id TEXT UNIQUE NOT NULL,
+        proxy_ip TEXT,
+        current_script TEXT DEFAULT 'none' CHECK(current_script IN ('gps', 'music', 'none')),
+        sync_status TEXT DEFAULT 'unknown' CHECK(sync_status IN ('online', 'offline', 'unknown')),
+        last_sync TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_devices_user
+    ON devices(user_id, sync_status, current_script);
+    CREATE INDEX IF NOT EXISTS idx_devices_sync_lastsync ON devices(sync_status, last_sync);
+
+    CREATE TABLE IF NOT EXISTS campaigns (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        device_id TEXT,
+        account_mode TEXT,
+        duration_hours INTEGER,
+        status TEXT DEFAULT 'queued' CHECK(status IN ('queued', 'processing', 'cooldown', 'completed', 'failed')),
+        current_step TEXT,
+        progress REAL DEFAULT 0,
+        queued_at TIMESTAMP,
+        processing_at TIMESTAMP,
+        cooldown_until TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP,
+        completed_at TIMESTAMP,
+        error_message TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(id),
+        FOREIGN KEY (device_id) REFERENCES devices(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_campaigns_status ON campaigns(status);
+
+    CREATE TABLE IF NOT EXISTS execution_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        campaign_id TEXT NOT NULL,
+        level TEXT NOT NULL CHECK(level IN ('debug', 'info', 'warning', 'error')),
+        message TEXT NOT NULL,
+        device_id TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (campaign_id) REFERENCES campaigns(id),
+        FOREIGN KEY (device_id) REFERENCES devices(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_logs_campaign_timestamp ON execution_logs(campaign_id, timestamp DESC);
+    CREATE INDEX IF NOT EXISTS idx_logs_device_timestamp ON execution_logs(device_id, timestamp DESC);
+'''
 
 # === Instantiate Managers ===
 
@@ -635,9 +873,8 @@ def health_check():
     """Health check endpoint for Railway monitoring"""
     try:
         # Test database connection
-        conn = get_db_connection()
-        conn.execute('SELECT 1')
-        conn.close()
+        with db_pool.borrow() as conn:
+            conn.execute('SELECT 1')
 
         return jsonify({
             'status': 'healthy',
@@ -743,14 +980,12 @@ def create_campaign():
     if not name:
         return jsonify({'error': 'Campaign name is required'}), 400
     campaign_id = str(uuid.uuid4())
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO campaigns (id, user_id, name, device_id, account_mode, duration_hours, status, current_step)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (campaign_id, user_id, name, device_id, account_mode, duration_hours, CampaignStatus.QUEUED.value, 'Waiting to start...'))
-    conn.commit()
-    conn.close()
+    with db_pool.borrow() as conn:
+        conn.execute('''
+            INSERT INTO campaigns (id, user_id, name, device_id, account_mode, duration_hours, status, current_step)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (campaign_id, user_id, name, device_id, account_mode, duration_hours, CampaignStatus.QUEUED.value, 'Waiting to start...'))
+        conn.commit()
     socketio.emit('campaign_created', {'campaign_id': campaign_id, 'name': name})
     return jsonify({'success': True, 'campaign_id': campaign_id, 'message': 'Campaign created successfully'}), 201
 
@@ -779,11 +1014,9 @@ def get_campaign_logs(campaign_id):
 def list_campaigns():
     """List all campaigns for the current user"""
     user_id = g.user['user_id']
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM campaigns WHERE user_id = ? ORDER BY created_at DESC LIMIT 50', (user_id,))
-    campaigns = [dict(row) for row in cursor.fetchall()]
-    conn.close()
+    with db_pool.borrow() as conn:
+        cursor = conn.execute('SELECT * FROM campaigns WHERE user_id = ? ORDER BY created_at DESC LIMIT 50', (user_id,))
+        campaigns = [dict(row) for row in cursor.fetchall()]
     return jsonify(campaigns)
 
 @app.route('/api/dashboard/stats')
@@ -791,17 +1024,15 @@ def list_campaigns():
 def dashboard_stats():
     """Get dashboard statistics"""
     user_id = g.user['user_id']
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    # Count campaigns by status
-    cursor.execute('''
-        SELECT status, COUNT(*) as count
-        FROM campaigns
-        WHERE user_id = ?
-        GROUP BY status
-    ''', (user_id,))
-    status_counts = {row['status']: row['count'] for row in cursor.fetchall()}
+    with db_pool.borrow() as conn:
+        # Count campaigns by status
+        cursor = conn.execute('''
+            SELECT status, COUNT(*) as count
+            FROM campaigns
+            WHERE user_id = ?
+            GROUP BY status
+        ''', (user_id,))
+        status_counts = {row['status']: row['count'] for row in cursor.fetchall()}
 
     stats = {
         'campaigns': {
@@ -814,7 +1045,6 @@ def dashboard_stats():
         'total_campaigns': sum(status_counts.values())
     }
 
-    conn.close()
     return jsonify(stats)
 
 @socketio.on('subscribe_logs')
@@ -833,45 +1063,66 @@ def unsubscribe_logs(data):
 
 # === Core campaign runner ===
 
+# Stop events let a runner be cancelled between steps instead of
+# sleeping uninterruptibly
+campaign_stop_events: Dict[str, threading.Event] = {}
+
+_STEP_NAMES = (
+    'Initializing GPS tracking...',
+    'Connecting to device...',
+    'Starting location tracking...',
+    'Monitoring activity...',
+    'Collecting data...',
+    'Finalizing campaign...',
+    'Campaign completed!'
+)
+# (step, progress) pairs precomputed once instead of per run
+CAMPAIGN_STEPS = tuple(
+    (step, int((i + 1) / len(_STEP_NAMES) * 100))
+    for i, step in enumerate(_STEP_NAMES)
+)
+
 def run_campaign(campaign_id: str):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM campaigns WHERE id = ?', (campaign_id,))
-    campaign = cursor.fetchone()
+    stop_event = campaign_stop_events.setdefault(campaign_id, threading.Event())
+    with db_pool.borrow() as conn:
+        campaign = conn.execute('SELECT * FROM campaigns WHERE id = ?', (campaign_id,)).fetchone()
     if not campaign:
         logger.error(f"Campaign {campaign_id} not found")
         return
     live_logger.add_log(campaign_id, 'info', 'Campaign started')
 
-    steps = [
-        'Initializing GPS tracking...'
-        , 'Connecting to device...'
-        , 'Starting location tracking...'
-        , 'Monitoring activity...'
-        , 'Collecting data...'
-        , 'Finalizing campaign...'
-        , 'Campaign completed!'
-    ]
-
-    for i, step in enumerate(steps):
-        progress = int((i + 1) / len(steps) * 100)
-        cursor.execute('UPDATE campaigns SET current_step = ?, progress = ? WHERE id = ?', (step, progress, campaign_id))
-        conn.commit()
+    # Payload built once; only the two varying keys change per step
+    progress_payload = {'campaign_id': campaign_id, 'current_step': None, 'progress': 0}
+    for step, progress in CAMPAIGN_STEPS:
+        # Borrow per step: holding a pooled connection across the sleeps
+        # would starve request handlers when several campaigns run at once.
+        # Still one UPDATE + commit per step; the log line goes through the
+        # batched LiveLogger buffer so it costs no extra fsync here
+        with db_pool.borrow() as conn:
+            conn.execute('UPDATE campaigns SET current_step = ?, progress = ? WHERE id = ?', (step, progress, campaign_id))
+            conn.commit()
         live_logger.add_log(campaign_id, 'info', step)
-        socketio.emit('campaign_progress', {'campaign_id': campaign_id, 'current_step': step, 'progress': progress})
-        time.sleep(2)  # Placeholder for real work
-
+        progress_payload['current_step'] = step
+        progress_payload['progress'] = progress
+        socketio.emit('campaign_progress', progress_payload)
+        if stop_event.wait(2):  # Placeholder for real work; cancellable
+            break
+
+    campaign_stop_events.pop(campaign_id, None)
+    if stop_event.is_set():
+        campaign_workflow.transition_status(campaign_id, CampaignStatus.FAILED.value, 'Campaign stopped')
+        live_logger.add_log(campaign_id, 'warning', 'Campaign stopped')
+        return
     campaign_workflow.transition_status(campaign_id, CampaignStatus.COMPLETED.value)
     live_logger.add_log(campaign_id, 'info', 'Campaign completed')
     socketio.emit('campaign_completed', {'campaign_id': campaign_id, 'status': 'completed'})
-    conn.close()
 
 # === Initialization ===
 
 def init_db():
-    init_auth_tables()
-    init_device_tables()
-    init_campaign_tables()
+    conn = get_db_connection()
+    conn.executescript(SCHEMA_DDL)
+    conn.close()
     logger.info("Initialized all database tables")
 
 if __name__ == '__main__':
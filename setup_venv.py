@@ -4,30 +4,287 @@ GPS Spoofing Campaign Manager - Virtual Environment Setup
 Automated setup script for creating and configuring the Python virtual environment
 """
 
+import hashlib
 import os
+import shutil
 import sys
 import subprocess
+import tempfile
+import threading
 import venv
 from pathlib import Path
 
-def run_command(command, cwd=None):
-    """Run a command and return success status"""
+# Built venvs are cached as tarballs keyed by requirements + interpreter,
+# so reruns with an unchanged requirements.txt skip venv creation and pip
+VENV_CACHE_DIR = Path.home() / ".cache" / "gps-spoofing" / "venvs"
+PIP_CACHE_DIR = Path.home() / ".cache" / "gps-spoofing" / "pip-cache"
+PIP_IMAGE_DIR = Path.home() / ".cache" / "gps-spoofing" / "pip-image"
+
+_ENV_TEMPLATE = """# GPS Spoofing Campaign Manager - Environment Configuration
+
+# Server Configuration
+HOST=0.0.0.0
+PORT=5002
+DEBUG=False
+
+# Security
+SECRET_KEY=your-secret-key-here-change-in-production
+JWT_SECRET_KEY=your-jwt-secret-key-here-change-in-production
+
+# CORS Origins (comma-separated)
+CORS_ORIGINS=*
+
+# Logging
+LOG_LEVEL=INFO
+
+# Database (SQLite)
+# DATABASE_PATH is automatically set to campaigns.db in project root
+
+# Android ADB (ensure ADB is in your PATH)
+# ADB_PATH=/path/to/adb
+"""
+
+# Environment for pip/uv subprocesses: skip the version self-check network
+# round-trip, never block on interactive prompts, no .pyc churn during install
+PIP_ENV = {
+    "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+    "PIP_NO_INPUT": "1",
+    "PYTHONDONTWRITEBYTECODE": "1",
+}
+
+def run_command(argv, cwd=None, env=None, capture=True):
+    """Run a command (argv list) and return success status
+
+    Pass capture=False for long, chatty commands (pip installs): output
+    streams straight to the terminal instead of buffering through pipes.
+    """
+    # argv form: no /bin/sh fork per call, no quoting bugs on paths
+    # containing spaces
+    display = " ".join(str(part) for part in argv)
     try:
-        result = subprocess.run(
-            command, 
-            shell=True, 
+        subprocess.run(
+            argv,
             cwd=cwd,
-            capture_output=True, 
+            env={**os.environ, **env} if env else None,
+            capture_output=capture,
             text=True,
             check=True
         )
-        print(f"✅ {command}")
+        print(f"✅ {display}")
         return True
     except subprocess.CalledProcessError as e:
-        print(f"❌ {command}")
-        print(f"Error: {e.stderr}")
+        print(f"❌ {display}")
+        if e.stderr:
+            print(f"Error: {e.stderr}")
+        return False
+
+def venv_cache_key(project_root):
+    """Cache key covering the requirements, interpreter and platform"""
+    req_bytes = (project_root / "requirements.txt").read_bytes()
+    lock_file = project_root / "requirements.lock"
+    if lock_file.is_file():
+        req_bytes += lock_file.read_bytes()
+    return hashlib.sha256(
+        req_bytes + sys.version.encode() + sys.platform.encode()
+    ).hexdigest()
+
+def restore_cached_venv(cache_file, project_root):
+    """Extract a previously built .venv tarball into the project root"""
+    result = subprocess.run(
+        ["tar", "--zstd", "-xf", str(cache_file), "-C", str(project_root)]
+    )
+    return result.returncode == 0
+
+def save_cached_venv(cache_file, project_root):
+    """Snapshot .venv into the cache for the next run with this key"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp")
+    result = subprocess.run(
+        ["tar", "--zstd", "-cf", str(tmp), "-C", str(project_root), ".venv"]
+    )
+    if result.returncode == 0:
+        os.replace(tmp, cache_file)
+    elif tmp.exists():
+        tmp.unlink()
+
+def build_pip_image():
+    """Extract ensurepip's bundled pip wheel into the image cache, once"""
+    if (PIP_IMAGE_DIR / "pip").is_dir():
+        return True
+    try:
+        import ensurepip
+        import zipfile
+        wheels = sorted(Path(ensurepip.__path__[0], "_bundled").glob("pip-*.whl"))
+        if not wheels:
+            return False
+        PIP_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(wheels[-1]) as wheel:
+            wheel.extractall(PIP_IMAGE_DIR)
+        return (PIP_IMAGE_DIR / "pip").is_dir()
+    except Exception:
         return False
 
+class FastEnvBuilder(venv.EnvBuilder):
+    """EnvBuilder that skips ensurepip and seeds pip from the wheel image
+
+    ensurepip re-extracts and reinstalls the bundled pip wheel on every
+    venv.create(with_pip=True); copying a pre-extracted package tree into
+    site-packages gets the same result in a fraction of the time.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["with_pip"] = False
+        super().__init__(**kwargs)
+
+    def post_setup(self, context):
+        if sys.platform == "win32":
+            site_packages = Path(context.env_dir) / "Lib" / "site-packages"
+        else:
+            pyver = "%d.%d" % sys.version_info[:2]
+            site_packages = Path(context.env_dir) / "lib" / f"python{pyver}" / "site-packages"
+        for entry in PIP_IMAGE_DIR.iterdir():
+            if entry.is_dir():
+                shutil.copytree(entry, site_packages / entry.name, dirs_exist_ok=True)
+        if sys.platform != "win32":
+            pip_launcher = Path(context.bin_path) / "pip"
+            pip_launcher.write_text(
+                f"#!{context.env_exe}\n"
+                "import sys\n"
+                "from pip._internal.cli.main import main\n"
+                "sys.exit(main())\n"
+            )
+            pip_launcher.chmod(0o755)
+
+def _create_seeded_venv(path):
+    """Create a venv with pip, via the fast builder when the image exists"""
+    if build_pip_image():
+        FastEnvBuilder(symlinks=(sys.platform != "win32")).create(path)
+    else:
+        venv.create(path, with_pip=True)
+
+def build_or_get_template():
+    """Build (first run only) and return a template venv for this interpreter"""
+    pyver = "%d.%d" % sys.version_info[:2]
+    template = VENV_CACHE_DIR.parent / f"template-venv-{pyver}"
+    if not (template / "pyvenv.cfg").is_file():
+        template.parent.mkdir(parents=True, exist_ok=True)
+        _create_seeded_venv(template)
+    return template
+
+def _retarget_venv(template, venv_path):
+    """Rewrite absolute template paths in pyvenv.cfg and script shebangs"""
+    bindir = venv_path / ("Scripts" if sys.platform == "win32" else "bin")
+    old, new = str(template), str(venv_path)
+    for path in [venv_path / "pyvenv.cfg", *bindir.iterdir()]:
+        if path.is_symlink() or not path.is_file():
+            continue
+        try:
+            text = path.read_text()
+        except (UnicodeDecodeError, OSError):
+            continue
+        if old in text:
+            # Unlink first: the file may be hardlinked into the template
+            mode = path.stat().st_mode
+            path.unlink()
+            path.write_text(text.replace(old, new))
+            path.chmod(mode)
+
+def create_venv(venv_path):
+    """Create a venv by cloning the cached template; fall back to venv.create
+
+    A hardlink clone of a template built once per interpreter skips
+    ensurepip's wheel extraction, turning ~2s of venv creation into ~100ms.
+    """
+    try:
+        template = build_or_get_template()
+        if sys.platform == "win32":
+            shutil.copytree(template, venv_path, symlinks=True)
+        else:
+            result = subprocess.run(["cp", "-al", f"{template}/.", str(venv_path)])
+            if result.returncode != 0:
+                raise OSError("hardlink clone failed")
+        _retarget_venv(template, venv_path)
+        return
+    except Exception:
+        if venv_path.exists():
+            shutil.rmtree(venv_path)
+    _create_seeded_venv(venv_path)
+
+def _warm_pip_cache(install_args):
+    """Prefetch requirement downloads into the shared pip cache"""
+    subprocess.run(
+        [sys.executable, "-m", "pip", "download",
+         "--dest", str(PIP_CACHE_DIR / "wheels"),
+         "--cache-dir", str(PIP_CACHE_DIR), *install_args],
+        capture_output=True,
+        env={**os.environ, **PIP_ENV},
+    )
+
+def install_in_batches(python_path, req_file):
+    """Install hashed and unhashed requirement lines as two concurrent pips
+
+    Returns None when the file does not mix hashed and unhashed lines (the
+    single-invocation path is better then), otherwise True/False for success.
+    Amortizes pip startup and overlaps the two batches' network fetches.
+    """
+    logical, current = [], ""
+    for raw in req_file.read_text().splitlines():
+        line = raw.split("#", 1)[0].rstrip() if not raw.lstrip().startswith("#") else ""
+        if line.endswith("\\"):
+            current += line[:-1] + " "
+            continue
+        current += line
+        if current.strip():
+            logical.append(current.strip())
+        current = ""
+    with_hash = [line for line in logical if "--hash=" in line]
+    no_hash = [line for line in logical if "--hash=" not in line]
+    if not with_hash or not no_hash:
+        return None
+    env = {**os.environ, **PIP_ENV}
+    procs, tmp_names = [], []
+    try:
+        for batch, extra in ((with_hash, ["--require-hashes"]), (no_hash, [])):
+            tmp = tempfile.NamedTemporaryFile(
+                "w", suffix=".txt", prefix="reqs-", delete=False
+            )
+            tmp.write("\n".join(batch) + "\n")
+            tmp.close()
+            tmp_names.append(tmp.name)
+            procs.append(subprocess.Popen(
+                [str(python_path), "-m", "pip", "install",
+                 "--cache-dir", str(PIP_CACHE_DIR),
+                 "--prefer-binary", "--only-binary=:all:",
+                 *extra, "-r", tmp.name],
+                env=env
+            ))
+        return all(proc.wait() == 0 for proc in procs)
+    finally:
+        for name in tmp_names:
+            try:
+                os.unlink(name)
+            except OSError:
+                pass
+
+# Bundled pip at or above this version is fine as-is; upgrading it costs a
+# full self-install round-trip for no benefit
+MIN_PIP_VERSION = (24, 0)
+
+def pip_is_fresh(python_path):
+    """True when the venv's pip is new enough to skip the self-upgrade"""
+    try:
+        out = subprocess.check_output(
+            [str(python_path), "-c", "import pip; print(pip.__version__)"],
+            text=True
+        ).strip()
+        return tuple(int(part) for part in out.split(".")[:2]) >= MIN_PIP_VERSION
+    except (subprocess.CalledProcessError, ValueError, OSError):
+        return False
+
+def ensure_uv(python_path):
+    """Bootstrap uv into the venv so installs run through its fast resolver"""
+    return run_command([str(python_path), "-m", "pip", "install", "uv"], env=PIP_ENV)
+
 def setup_virtual_environment():
     """Create and setup virtual environment"""
     project_root = Path(__file__).parent
@@ -36,77 +293,123 @@ def setup_virtual_environment():
     print("🚀 Setting up GPS Spoofing Campaign Manager...")
     print(f"Project root: {project_root}")
     
-    # Check if .venv already exists
-    if venv_path.exists():
+    # Check for pyvenv.cfg rather than the directory: one stat, and a broken
+    # half-created venv (directory without cfg) gets rebuilt instead of kept
+    if (venv_path / "pyvenv.cfg").is_file():
         print("⚠️  Virtual environment already exists")
         response = input("Do you want to recreate it? (y/N): ").lower()
         if response != 'y':
             print("Skipping virtual environment creation")
             return True
         
-        # Remove existing venv
-        import shutil
-        shutil.rmtree(venv_path)
+        # Rename out of the way instantly and delete in the background;
+        # the rebuild proceeds while the old 100MB tree is unlinked
+        old_venv = venv_path.with_name(f".venv.old-{os.getpid()}")
+        os.rename(venv_path, old_venv)
+        threading.Thread(
+            target=shutil.rmtree, args=(old_venv,),
+            kwargs={"ignore_errors": True}, daemon=True
+        ).start()
         print("🗑️  Removed existing virtual environment")
-    
-    # Create virtual environment
-    print("📦 Creating virtual environment...")
-    try:
-        venv.create(venv_path, with_pip=True)
-        print("✅ Virtual environment created successfully")
-    except Exception as e:
-        print(f"❌ Failed to create virtual environment: {e}")
-        return False
-    
-    # Determine activation script and pip path based on OS
-    if sys.platform == "win32":
-        activate_script = venv_path / "Scripts" / "activate"
-        pip_path = venv_path / "Scripts" / "pip"
-        python_path = venv_path / "Scripts" / "python"
-    else:
-        activate_script = venv_path / "bin" / "activate"
-        pip_path = venv_path / "bin" / "pip"
-        python_path = venv_path / "bin" / "python"
-    
-    # Upgrade pip
-    print("⬆️  Upgrading pip...")
-    if not run_command(f'"{python_path}" -m pip install --upgrade pip'):
-        return False
-    
-    # Install requirements
-    print("📋 Installing requirements...")
-    if not run_command(f'"{pip_path}" install -r requirements.txt'):
-        return False
-    
-    # Create .env file if it doesn't exist
-    env_file = project_root / ".env"
-    if not env_file.exists():
-        print("📝 Creating .env file...")
-        env_content = """# GPS Spoofing Campaign Manager - Environment Configuration
+    elif venv_path.is_dir():
+        # Directory without pyvenv.cfg: a broken half-created venv, rebuild
+        shutil.rmtree(venv_path)
 
-# Server Configuration
-HOST=0.0.0.0
-PORT=5002
-DEBUG=False
+    # Try the tarball cache before building anything from scratch
+    restored = False
+    cache_file = VENV_CACHE_DIR / f"{venv_cache_key(project_root)}.tar.zst"
+    have_tar = shutil.which("tar") is not None
+    if cache_file.is_file() and have_tar:
+        print("📦 Restoring virtual environment from cache...")
+        restored = restore_cached_venv(cache_file, project_root)
+        if restored:
+            print("✅ Virtual environment restored from cache")
 
-# Security
-SECRET_KEY=your-secret-key-here-change-in-production
-JWT_SECRET_KEY=your-jwt-secret-key-here-change-in-production
+    if not restored:
+        # A fully pinned requirements.lock (regenerate with
+        # `pip-compile --generate-hashes -o requirements.lock requirements.txt`)
+        # skips the backtracking resolver entirely: --no-deps installs exactly
+        # the listed pins and --require-hashes verifies them
+        lock_file = project_root / "requirements.lock"
+        if lock_file.is_file():
+            install_args = ["--no-deps", "--require-hashes", "-r", str(lock_file)]
+        else:
+            install_args = ["-r", "requirements.txt"]
 
-# CORS Origins (comma-separated)
-CORS_ORIGINS=*
+        # Warm the shared pip cache in the background while the venv is
+        # being created, overlapping network I/O with filesystem work
+        warm_thread = threading.Thread(
+            target=_warm_pip_cache, args=(install_args,), daemon=True
+        )
+        warm_thread.start()
 
-# Logging
-LOG_LEVEL=INFO
+        # Create virtual environment
+        print("📦 Creating virtual environment...")
+        try:
+            create_venv(venv_path)
+            print("✅ Virtual environment created successfully")
+        except Exception as e:
+            print(f"❌ Failed to create virtual environment: {e}")
+            return False
 
-# Database (SQLite)
-# DATABASE_PATH is automatically set to campaigns.db in project root
+        if sys.platform == "win32":
+            pip_path = venv_path / "Scripts" / "pip"
+            python_path = venv_path / "Scripts" / "python"
+        else:
+            pip_path = venv_path / "bin" / "pip"
+            python_path = venv_path / "bin" / "python"
 
-# Android ADB (ensure ADB is in your PATH)
-# ADB_PATH=/path/to/adb
-"""
-        with open(env_file, 'w') as f:
-            f.write(env_content)
+        # Let the prefetch finish so the install below hits a warm cache
+        warm_thread.join()
+
+        # Install requirements through uv when possible: it resolves and
+        # installs in parallel and is much faster than pip on a cold venv.
+        # Set USE_UV=0 to force the plain pip path.
+        use_uv = os.environ.get("USE_UV", "1") != "0"
+        if use_uv and ensure_uv(python_path):
+            print("⚡ Installing requirements with uv...")
+            if not run_command(
+                [str(python_path), "-m", "uv", "pip", "install", *install_args],
+                env=PIP_ENV, capture=False
+            ):
+                return False
+        else:
+            # Fallback: plain pip. One invocation upgrades pip and installs
+            # the requirements, paying pip's interpreter/resolver startup once.
+            # Wheel-only so a missing wheel fails fast instead of silently
+            # falling into a PEP 517 source build with its own nested venv
+            print("📋 Installing requirements...")
+            upgrade_args = [] if pip_is_fresh(python_path) else ["--upgrade", "pip"]
+            batched = None
+            if not lock_file.is_file():
+                batched = install_in_batches(python_path, project_root / "requirements.txt")
+            if batched is not None:
+                if not batched:
+                    return False
+                # Batches replace the combined call; upgrade pip separately
+                if upgrade_args and not run_command(
+                    [str(python_path), "-m", "pip", "install", *upgrade_args],
+                    env=PIP_ENV
+                ):
+                    return False
+            elif not run_command(
+                [str(python_path), "-m", "pip", "install",
+                 "--cache-dir", str(PIP_CACHE_DIR),
+                 "--prefer-binary", "--only-binary=:all:",
+                 *upgrade_args, *install_args],
+                env=PIP_ENV, capture=False
+            ):
+                return False
+
+        if have_tar:
+            print("💾 Caching virtual environment...")
+            save_cached_venv(cache_file, project_root)
+    
+    # Create .env file if it doesn't exist
+    env_file = project_root / ".env"
+    if not env_file.exists():
+        print("📝 Creating .env file...")
+        env_file.write_text(_ENV_TEMPLATE)
         print("✅ .env file created")
     
     print("\n🎉 Setup completed successfully!")
@@ -127,20 +430,40 @@ LOG_LEVEL=INFO
     
     return True
 
+def preflight(project_root):
+    """Validate the setup prerequisites with pure-Python checks
+
+    Runs before any subprocess is spawned so misconfigured machines fail
+    fast, and makes --check/--dry-run mode instant.
+    """
+    if sys.version_info < (3, 7):
+        return False, f"Python 3.7 or higher is required (current: {sys.version})"
+    req_file = project_root / "requirements.txt"
+    if not req_file.is_file():
+        return False, f"requirements.txt not found at {req_file}"
+    lines = (line.strip() for line in req_file.read_text().splitlines())
+    if not any(line and not line.startswith("#") for line in lines):
+        return False, "requirements.txt contains no requirements"
+    return True, "OK"
+
 def main():
     """Main setup function"""
     print("=" * 60)
     print("GPS Spoofing Campaign Manager - Virtual Environment Setup")
     print("=" * 60)
-    
-    # Check Python version
-    if sys.version_info < (3, 7):
-        print("❌ Python 3.7 or higher is required")
-        print(f"Current version: {sys.version}")
+
+    project_root = Path(__file__).parent
+    ok, detail = preflight(project_root)
+    if not ok:
+        print(f"❌ {detail}")
         return False
-    
+
     print(f"✅ Python version: {sys.version}")
-    
+
+    if any(arg in ("--check", "--dry-run") for arg in sys.argv[1:]):
+        print("✅ Preflight checks passed (no changes made)")
+        return True
+
     # Run setup
     success = setup_virtual_environment()
     
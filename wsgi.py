@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+GPS Campaign Manager v2.2 - WSGI entry point
+
+The v2.2 module filename contains dots, so gunicorn's "module:app" import
+syntax cannot target it directly. This wrapper loads it via importlib and
+re-exports the Flask app for production servers:
+
+    gunicorn -k eventlet -w 1 "wsgi:app"
+
+(Socket.IO needs a single worker unless a message queue and sticky
+sessions are configured.)
+"""
+
+import importlib.util
+from pathlib import Path
+
+_module_path = Path(__file__).parent / "gps_campaign_manager_v2.2.py"
+_spec = importlib.util.spec_from_file_location("gps_campaign_manager_v2_2", _module_path)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+app = _module.app
+socketio = _module.socketio